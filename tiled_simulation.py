@@ -0,0 +1,294 @@
+import numpy as np
+import argparse
+import os
+import time
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from scipy.spatial import cKDTree
+from scipy.sparse import csr_matrix
+
+"""
+Headless, domain-decomposed simulation for very large deployment areas.
+
+The field is split into rectangular tiles, one per worker process. All node
+state lives in shared memory and every worker only writes the nodes of its own
+tile. Each round a worker reads back just the halo: nodes of other tiles that
+lie within halo_width, the larger of cluster_range and interest_range, of its
+tile edges. Because no node can affect anything further away than that, LEACH membership, interest flooding and carrier
+sensing give the same result whatever the number of tiles.
+
+Example: python tiled_simulation.py --protocol leach --workers 8
+"""
+
+# Parameters
+num_nodes = 1_000_000  # Number of sensor nodes
+area_size = 10_000  # Size of the simulation area (10000x10000 grid)
+initial_energy = 10.0  # Initial energy in Joules for each node
+tx_energy = 0.5  # Transmission energy per message
+rx_energy = 0.3  # Reception energy per message
+cluster_range = 20  # Communication range for cluster formation
+interest_range = 20  # Range over which interest messages are heard
+max_rounds = 50  # Maximum number of rounds
+cluster_head_probability = 0.2  # Probability of a node becoming a cluster head
+interest_prob = 0.2  # Probability of generating an interest message
+transmit_prob = 0.3  # Probability of a node trying to access the medium
+seed = 0  # Seed for node placement and per-node random draws
+
+halo_width = max(cluster_range, interest_range)  # Boundary strip shared between tiles
+
+# Per-node random streams, one per protocol decision
+LEACH_STREAM = 1
+DIFFUSION_STREAM = 2
+MAC_STREAM = 3
+
+# Counter-based uniform draws: the value for a node only depends on its id,
+# the round and the stream, so results do not change with the tiling.
+def uniform_draws(node_ids, round_num, stream):
+    with np.errstate(over='ignore'):
+        z = node_ids.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        z ^= np.uint64((seed * 1_000_003 + round_num) * 0x100000001B3 + stream)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z ^= z >> np.uint64(31)
+    return (z >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+# Split the workers into a tiles_x by tiles_y grid that is as square as possible
+def tile_grid(num_tiles):
+    tiles_y = int(np.sqrt(num_tiles))
+    while num_tiles % tiles_y:
+        tiles_y -= 1
+    return num_tiles // tiles_y, tiles_y
+
+# Tile index of every node, row-major over the tile grid
+def assign_tiles(x, y, tiles_x, tiles_y):
+    col = np.minimum((x * tiles_x / area_size).astype(np.int64), tiles_x - 1)
+    row = np.minimum((y * tiles_y / area_size).astype(np.int64), tiles_y - 1)
+    return row * tiles_x + col
+
+# Shared memory helpers
+def create_shared_array(count, dtype):
+    shm = shared_memory.SharedMemory(create=True, size=max(count * np.dtype(dtype).itemsize, 1))
+    return shm, np.ndarray((count,), dtype=dtype, buffer=shm.buf)
+
+def attach_shared_array(spec, count):
+    name, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray((count,), dtype=dtype, buffer=shm.buf)
+
+# Place nodes and sort them by tile so each worker owns a contiguous slice
+def create_nodes(num_tiles):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(10, area_size - 10, num_nodes)
+    y = rng.uniform(10, area_size - 10, num_nodes)
+    tiles = assign_tiles(x, y, *tile_grid(num_tiles))
+    order = np.argsort(tiles, kind='stable')
+    bounds = np.searchsorted(tiles[order], np.arange(num_tiles + 1))
+    return order, x[order], y[order], bounds
+
+# Nodes of other tiles within halo_width of this tile's edges
+def find_halo(x, y, tile, start, end, num_tiles):
+    tiles_x, tiles_y = tile_grid(num_tiles)
+    tile_w, tile_h = area_size / tiles_x, area_size / tiles_y
+    x0, y0 = (tile % tiles_x) * tile_w, (tile // tiles_x) * tile_h
+    near = ((x >= x0 - halo_width) & (x < x0 + tile_w + halo_width) &
+            (y >= y0 - halo_width) & (y < y0 + tile_h + halo_width))
+    near[start:end] = False
+    return np.flatnonzero(near)
+
+# Sparse links from each owned node to every local node (owned + halo) in range.
+# Owned nodes come first in the local ordering, so link (i, i) is the node itself.
+def build_links(local_x, local_y, num_own, radius):
+    local_tree = cKDTree(np.column_stack((local_x, local_y)))
+    own_tree = cKDTree(np.column_stack((local_x[:num_own], local_y[:num_own])))
+    pairs = own_tree.sparse_distance_matrix(local_tree, radius, output_type='ndarray')
+    ones = np.ones(len(pairs), dtype=np.float64)
+    return csr_matrix((ones, (pairs['i'], pairs['j'])), shape=(num_own, len(local_x)))
+
+def drain_energy(energy, amount):
+    np.maximum(energy - amount, 0, out=energy)
+
+# LEACH: elect cluster heads in the owned tile
+def leach_elect(ctx, round_num):
+    own = ctx['own']
+    draws = uniform_draws(ctx['node_ids'], round_num, LEACH_STREAM)
+    ctx['active'][own] = (draws < cluster_head_probability) & (ctx['energy'][own] > 0)
+
+# LEACH: nodes with no cluster head in range (in any tile) are isolated
+def leach_communicate(ctx, round_num):
+    own = ctx['own']
+    is_cluster_head = ctx['active'][own].astype(bool)
+    heads_in_range = ctx['links'] @ ctx['active'][ctx['local']].astype(np.float64)
+    is_isolated = ~is_cluster_head & (heads_in_range == 0)
+    ctx['isolated'][own] = is_isolated
+    cost = np.where(is_isolated, tx_energy * 2, np.where(is_cluster_head, tx_energy, rx_energy))
+    drain_energy(ctx['energy'][own], cost)
+
+# Directed Diffusion: owned nodes decide whether to send an interest
+def diffusion_send(ctx, round_num):
+    own = ctx['own']
+    energy = ctx['energy'][own]
+    draws = uniform_draws(ctx['node_ids'], round_num, DIFFUSION_STREAM)
+    sending = (energy > 0) & (draws < interest_prob)
+    ctx['active'][own] = sending
+    drain_energy(energy, np.where(sending, tx_energy, 0.0))
+
+# Directed Diffusion: every node drains energy for each interest it hears,
+# including interests flooded from senders in neighbouring tiles
+def diffusion_receive(ctx, round_num):
+    own = ctx['own']
+    heard = ctx['links'] @ ctx['active'][ctx['local']].astype(np.float64)
+    energy = ctx['energy'][own]
+    drain_energy(energy, np.where(energy > 0, rx_energy * heard, 0.0))
+
+# CSMA/CA: a node only transmits if it senses no carrier from last round,
+# including carriers of neighbours on the other side of a tile edge
+def mac_transmit(ctx, round_num):
+    own = ctx['own']
+    energy = ctx['energy'][own]
+    carrier = ctx['carrier'][ctx['local']].astype(np.float64)
+    sensed = ctx['links'] @ carrier - carrier[:len(energy)]  # Ignore the node's own carrier
+    draws = uniform_draws(ctx['node_ids'], round_num, MAC_STREAM)
+    transmitting = (energy > 0) & (draws < transmit_prob) & (sensed == 0)
+    ctx['active'][own] = transmitting
+    drain_energy(energy, np.where(transmitting, tx_energy, 0.0))
+
+# CSMA/CA: publish this round's transmissions as the carrier for the next one
+def mac_publish(ctx, round_num):
+    own = ctx['own']
+    ctx['carrier'][own] = ctx['active'][own]
+
+PROTOCOLS = {
+    'leach': (leach_elect, leach_communicate, cluster_range),
+    'directed_diffusion': (diffusion_send, diffusion_receive, interest_range),
+    'mac': (mac_transmit, mac_publish, cluster_range),
+}
+
+# Worker process: simulate one tile, synchronising with the others between phases
+def run_tile(tile, num_tiles, bounds, specs, protocol, barrier, settings):
+    globals().update(settings)  # Command line overrides also reach spawned workers
+    handles, arrays = [], {}
+    for key, spec in specs.items():
+        shm, array = attach_shared_array(spec, num_nodes)
+        handles.append(shm)
+        arrays[key] = array
+    try:
+        start, end = int(bounds[tile]), int(bounds[tile + 1])
+        halo = find_halo(arrays['x'], arrays['y'], tile, start, end, num_tiles)
+        local = np.concatenate((np.arange(start, end), halo))
+        first_phase, second_phase, radius = PROTOCOLS[protocol]
+        ctx = dict(arrays, own=slice(start, end), local=local,
+                   node_ids=arrays['node_id'][start:end],
+                   links=build_links(arrays['x'][local], arrays['y'][local], end - start, radius))
+        barrier.wait()  # Setup done
+        for round_num in range(1, max_rounds + 1):
+            first_phase(ctx, round_num)
+            barrier.wait()
+            second_phase(ctx, round_num)
+            barrier.wait()
+        del ctx, arrays
+    except threading.BrokenBarrierError:
+        return  # Another tile failed, the parent reports it and stops the rest
+    except BaseException:
+        barrier.abort()  # Release the other tiles instead of leaving them waiting
+        raise
+    finally:
+        for shm in handles:
+            shm.close()
+
+# Parent-side watchdog: a worker killed by a signal (e.g. the OOM killer) never
+# aborts the barrier itself, so abort it here as soon as any tile exits badly
+def watch_tiles(workers, barrier, finished):
+    pending = {worker.sentinel: worker for worker in workers}
+    while pending and not finished.is_set():
+        for sentinel in wait(list(pending), timeout=0.5):
+            worker = pending.pop(sentinel)
+            worker.join()
+            if worker.exitcode != 0:
+                barrier.abort()
+                return
+
+# Run the tiled simulation and return the final energy and isolated flag of
+# every node by node id
+def simulate(protocol, num_workers):
+    order, x, y, bounds = create_nodes(num_workers)
+    handles, arrays, specs = [], {}, {}
+    layout = {'x': np.float64, 'y': np.float64, 'node_id': np.int64, 'energy': np.float64,
+              'active': np.int8, 'isolated': np.int8, 'carrier': np.int8}
+    for key, dtype in layout.items():
+        shm, array = create_shared_array(num_nodes, dtype)
+        handles.append(shm)
+        arrays[key] = array
+        specs[key] = (shm.name, dtype)
+    try:
+        arrays['x'][:], arrays['y'][:], arrays['node_id'][:] = x, y, order
+        arrays['energy'][:] = initial_energy
+        for key in ('active', 'isolated', 'carrier'):
+            arrays[key][:] = 0
+
+        barrier = mp.Barrier(num_workers + 1)
+        settings = {'num_nodes': num_nodes, 'area_size': area_size, 'max_rounds': max_rounds}
+        workers = [mp.Process(target=run_tile, args=(tile, num_workers, bounds, specs, protocol, barrier, settings))
+                   for tile in range(num_workers)]
+        for worker in workers:
+            worker.start()
+
+        finished = threading.Event()
+        watchdog = threading.Thread(target=watch_tiles, args=(workers, barrier, finished), daemon=True)
+        watchdog.start()
+
+        round_times = []
+        try:
+            barrier.wait()
+            for round_num in range(1, max_rounds + 1):
+                started = time.perf_counter()
+                barrier.wait()
+                barrier.wait()
+                round_times.append(time.perf_counter() - started)
+        except threading.BrokenBarrierError:
+            for worker in workers:
+                worker.terminate()  # A failed tile leaves the round incomplete
+        finally:
+            finished.set()
+            watchdog.join()
+        for worker in workers:
+            worker.join()
+        if any(worker.exitcode != 0 for worker in workers):
+            raise RuntimeError("A tile worker exited with an error")
+
+        energy = np.empty(num_nodes)
+        energy[order] = arrays['energy']
+        isolated = np.empty(num_nodes, dtype=bool)
+        isolated[order] = arrays['isolated']
+        del arrays
+        return energy, isolated, round_times
+    finally:
+        for shm in handles:
+            shm.close()
+            shm.unlink()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Domain-decomposed WSN simulation")
+    parser.add_argument('--protocol', choices=sorted(PROTOCOLS), default='leach')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--nodes', type=int, default=num_nodes)
+    parser.add_argument('--area', type=float, default=area_size)
+    parser.add_argument('--rounds', type=int, default=max_rounds)
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.nodes < 1:
+        parser.error("--nodes must be at least 1")
+    if args.rounds < 1:
+        parser.error("--rounds must be at least 1")
+    if args.area <= 20:
+        parser.error("--area must be greater than 20, nodes are placed 10 units inside the edges")
+    num_nodes, area_size, max_rounds = args.nodes, args.area, args.rounds
+
+    energy, isolated, round_times = simulate(args.protocol, args.workers)
+    print(f"{args.protocol}: {args.workers} tiles, {num_nodes} nodes on a {area_size:g}x{area_size:g} field")
+    print(f"Mean round time: {np.mean(round_times) * 1000:.1f} ms")
+    print(f"Alive nodes: {np.count_nonzero(energy > 0)}, mean remaining energy: {energy.mean():.3f} J")
+    if args.protocol == 'leach':
+        print(f"Isolated nodes in the last round: {np.count_nonzero(isolated)}")